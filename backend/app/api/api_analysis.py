@@ -1,33 +1,21 @@
 # backend/app/api/api_analysis.py
-import math
 from fastapi import APIRouter, Body
 from sqlalchemy.orm import Session
 from app.db import SessionLocal
-from app.models import Profile
+from app.logic.analysis_utils import get_latest_prompt_profile
 from app.logic.gemini import get_conversational_feedback
+from app.logic.utils import calculate_angle
 
 router = APIRouter()
 
 def get_latest_profile() -> dict | None:
-    """DB에서 가장 최근 체형분석(profile) 데이터 가져오기"""
+    """DB에서 가장 최근 체형분석(profile) 데이터를 프롬프트용으로 축소된 값(캐시)으로 가져오기"""
     db: Session = SessionLocal()
     try:
-        profile = db.query(Profile).order_by(Profile.created_at.desc()).first()
-        if profile:
-            return profile.measures  # or profile.body
-        return None
+        return get_latest_prompt_profile(db, None)
     finally:
         db.close()
 
-def calculate_angle(a, b, c):
-    try:
-        if not all(k in a and k in b and k in c for k in ('x', 'y')): return None
-        rad = math.atan2(c['y'] - b['y'], c['x'] - b['x']) - math.atan2(a['y'] - b['y'], a['x'] - b['x'])
-        angle = abs(math.degrees(rad))
-        if angle > 180: angle = 360 - angle
-        return angle
-    except (TypeError, KeyError): return None
-
 def calculate_calories(exercise_name: str, weight_kg: float, duration_seconds: int) -> float:
     mets_values = { "squat": 5.0, "pushup": 8.0, "lunge": 4.0, "plank": 3.0 }
     mets = mets_values.get(exercise_name.lower(), 3.5)
@@ -83,7 +71,7 @@ async def analyze_workout_set(data: dict = Body(...)):
         exercise_name=exercise_name,
         rep_counter=rep_count,
         stage="completed",
-        body_profile=user_profile,
+        compact_profile_data=user_profile,
         real_time_analysis=analysis,
     )
 
@@ -2,7 +2,7 @@ from fastapi import APIRouter, Body, Depends
 from sqlalchemy.orm import Session
 
 from app.logic.gemini import get_conversational_feedback, get_overall_feedback
-from app.logic.analysis_utils import get_latest_profile
+from app.logic.analysis_utils import get_latest_prompt_profile
 from app.db import get_db
 
 router = APIRouter(prefix="/api/feedback", tags=["Feedback"])
@@ -33,8 +33,8 @@ async def feedback_per_set(data: dict = Body(...), db: Session = Depends(get_db)
     total_sets   = int(data.get("total_sets", 1))
     target_reps  = int(data.get("target_reps", rep_count))
 
-    # DB에서 최신 프로필(체형분석) 조회
-    body_profile = get_latest_profile(db, user_id)
+    # DB에서 최신 프로필(체형분석) 조회 — 프롬프트용으로 축소된 값을 캐시에서 재사용
+    body_profile = get_latest_prompt_profile(db, user_id)
 
     # 추가 컨텍스트(세트/타깃/표시명) 함께 전달
     extra = {
@@ -49,7 +49,7 @@ async def feedback_per_set(data: dict = Body(...), db: Session = Depends(get_db)
         exercise_name=exercise_id,
         rep_counter=rep_count,
         stage=stage,
-        body_profile=body_profile,
+        compact_profile_data=body_profile,
         real_time_analysis=history,
         extra_context=extra,   # 👈 추가
     )
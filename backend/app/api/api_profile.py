@@ -1,11 +1,16 @@
 # app/api/api_profile.py
 from typing import List
 from uuid import UUID
-from fastapi import APIRouter, Body, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import DBAPIError, IntegrityError
 from sqlalchemy.orm import Session
 
 from app.db import get_db
 from app import models
+from app.logic.bulk_io import (
+    EXPORT_FORMATS, EXPORT_MEDIA_TYPES, bulk_insert, iter_rows, resolve_columns, stream_rows,
+)
 
 router = APIRouter(prefix="/api", tags=["profiles"])
 
@@ -50,3 +55,40 @@ def get_profile(profile_id: UUID, db: Session = Depends(get_db)):
 def list_profiles(limit: int = 50, offset: int = 0, db: Session = Depends(get_db)):
     q = db.query(models.Profile).order_by(models.Profile.created_at.desc()).offset(offset).limit(limit)
     return q.all()
+
+@router.get("/profiles/export")
+def export_profiles(format: str = "ndjson", columns: str | None = None):
+    """
+    전체 Profile을 서버 사이드 커서로 스트리밍 (NDJSON 또는 CSV).
+    예: /api/profiles/export?format=csv&columns=id,user_id,version,measures
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {EXPORT_FORMATS}")
+    table = models.Profile.__table__
+    try:
+        cols = resolve_columns(table, columns)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return StreamingResponse(
+        stream_rows(table, cols, format, order_by="created_at"),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="profiles.{format}"'},
+    )
+
+@router.post("/profiles/import")
+async def import_profiles(request: Request, db: Session = Depends(get_db)):
+    """
+    NDJSON(기본) 또는 CSV(Content-Type: text/csv) 바디로 Profile 대량 적재.
+    한 줄 예: {"user_id": "dev-user-01", "version": 1, "body": {...}, "measures": {...}}
+    export 결과를 그대로 넣을 수 있음 (id/created_at 유지). 이미 있는 id면 전체 롤백 후 409.
+    """
+    rows = iter_rows(request.stream(), request.headers.get("content-type"))
+    try:
+        inserted = await bulk_insert(db, rows, models.Profile.__table__)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except IntegrityError as e:
+        raise HTTPException(status_code=409, detail=f"중복 또는 제약 조건 위반: {e.orig}")
+    except DBAPIError as e:
+        raise HTTPException(status_code=400, detail=f"적재 실패: {e.orig}")
+    return {"ok": True, "inserted": inserted}
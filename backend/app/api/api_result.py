@@ -1,8 +1,13 @@
 # app/api/api_results.py
-from fastapi import APIRouter, Body, Depends
+from fastapi import APIRouter, Body, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import DBAPIError, IntegrityError
 from sqlalchemy.orm import Session
 from app.db import get_db
 from app.models import WorkoutResult
+from app.logic.bulk_io import (
+    EXPORT_FORMATS, EXPORT_MEDIA_TYPES, bulk_insert, iter_rows, resolve_columns, stream_rows,
+)
 from app.logic.gemini import get_overall_feedback
 
 router = APIRouter(prefix="/api", tags=["results"])
@@ -14,3 +19,40 @@ def save_result(payload: dict = Body(...), db: Session = Depends(get_db)):
     db.commit()
     db.refresh(obj)
     return {"ok": True, "id": str(obj.id)}
+
+@router.get("/results/export")
+def export_results(format: str = "ndjson", columns: str | None = None):
+    """
+    전체 WorkoutResult를 서버 사이드 커서로 스트리밍 (NDJSON 또는 CSV).
+    예: /api/results/export?columns=exercise_name,total_reps,avg_accuracy,created_at
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {EXPORT_FORMATS}")
+    table = WorkoutResult.__table__
+    try:
+        cols = resolve_columns(table, columns)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return StreamingResponse(
+        stream_rows(table, cols, format, order_by="created_at"),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="results.{format}"'},
+    )
+
+@router.post("/results/import")
+async def import_results(request: Request, db: Session = Depends(get_db)):
+    """
+    NDJSON(기본) 또는 CSV(Content-Type: text/csv) 바디로 WorkoutResult 대량 적재.
+    PostgreSQL은 COPY, 그 외 DB는 executemany로 적재. 바디는 스트리밍으로 배치 단위 처리.
+    이미 있는 id면 전체 롤백 후 409.
+    """
+    rows = iter_rows(request.stream(), request.headers.get("content-type"))
+    try:
+        inserted = await bulk_insert(db, rows, WorkoutResult.__table__)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except IntegrityError as e:
+        raise HTTPException(status_code=409, detail=f"중복 또는 제약 조건 위반: {e.orig}")
+    except DBAPIError as e:
+        raise HTTPException(status_code=400, detail=f"적재 실패: {e.orig}")
+    return {"ok": True, "inserted": inserted}
@@ -1,18 +1,38 @@
 # app/logic/analysis_utils.py
+from collections import OrderedDict
 from typing import Optional
 from sqlalchemy import select, desc
 from sqlalchemy.orm import Session
 from app.models import Profile
+from app.logic.prompt_builder import compact_profile
 
-def get_latest_profile(db: Session, user_id: Optional[str]) -> Optional[dict]:
+# (profile id, updated_at) → 프롬프트용으로 양자화된 measures
+_PROMPT_PROFILE_CACHE: "OrderedDict[tuple, Optional[dict]]" = OrderedDict()
+_PROMPT_PROFILE_CACHE_MAX = 256
+
+def get_latest_prompt_profile(db: Session, user_id: Optional[str]) -> Optional[dict]:
     """
-    해당 user_id의 가장 최근 Profile.measures(체형분석 baseline)를 반환.
-    user_id가 None이면 전체 중 최신 1건을 반환.
+    해당 user_id의 가장 최근 Profile.measures(체형분석 baseline)를 프롬프트용(화이트리스트 + 양자화)으로 반환.
+    user_id가 None이면 전체 중 최신 1건.
+    먼저 id/updated_at만 조회하고, 프로필이 바뀐 경우에만 measures(JSONB)를 읽어 한 번 축소한 뒤 캐시한다.
     """
-    stmt = select(Profile)
+    stmt = select(Profile.id, Profile.updated_at)
     if user_id:
         stmt = stmt.where(Profile.user_id == user_id)
     stmt = stmt.order_by(desc(Profile.created_at)).limit(1)
 
-    obj = db.execute(stmt).scalars().first()
-    return obj.measures if obj else None
+    row = db.execute(stmt).first()
+    if not row:
+        return None
+
+    key = (row.id, row.updated_at)
+    if key in _PROMPT_PROFILE_CACHE:
+        _PROMPT_PROFILE_CACHE.move_to_end(key)
+        return _PROMPT_PROFILE_CACHE[key]
+
+    measures = db.execute(select(Profile.measures).where(Profile.id == row.id)).scalar()
+    compact = compact_profile(measures)
+    _PROMPT_PROFILE_CACHE[key] = compact
+    if len(_PROMPT_PROFILE_CACHE) > _PROMPT_PROFILE_CACHE_MAX:
+        _PROMPT_PROFILE_CACHE.popitem(last=False)
+    return compact
@@ -0,0 +1,367 @@
+# app/logic/bulk_io.py
+import codecs
+import io
+import json
+import uuid
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Table, insert, select
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from sqlalchemy.orm import Session
+
+from app.db import engine
+
+# 서버 사이드 커서에서 한 번에 가져올 행 수 (메모리 상한)
+EXPORT_BATCH_SIZE = 1000
+# COPY / executemany 한 번에 밀어넣을 행 수
+IMPORT_BATCH_SIZE = 5000
+
+# CSV에서 NULL을 나타내는 표시 (따옴표 없는 \N). 빈 문자열은 항상 "" 로 따옴표 처리해 NULL과 구분
+CSV_NULL = "\\N"
+
+EXPORT_FORMATS = ("ndjson", "csv")
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def resolve_columns(table: Table, columns: Optional[str]) -> List[str]:
+    """
+    "id,version,measures" 형태의 컬럼 프로젝션 문자열을 검증해 컬럼명 리스트로 반환.
+    비어 있으면 테이블 전체 컬럼. 없는 컬럼이 있으면 ValueError.
+    """
+    if not columns:
+        return [c.name for c in table.columns]
+    names = [c.strip() for c in columns.split(",") if c.strip()]
+    unknown = [n for n in names if n not in table.c]
+    if unknown:
+        raise ValueError(f"알 수 없는 컬럼: {', '.join(unknown)}")
+    return names
+
+
+# --- 직렬화 ---
+def _python_type(table: Table, name: str) -> Optional[type]:
+    try:
+        return table.c[name].type.python_type
+    except NotImplementedError:
+        return None
+
+
+def _to_jsonable(v: Any) -> Any:
+    if isinstance(v, uuid.UUID):
+        return str(v)
+    if isinstance(v, (datetime, date)):
+        return v.isoformat()
+    return v
+
+
+def _json_flags(table: Table, columns: Sequence[str]) -> List[bool]:
+    return [_python_type(table, c) in (dict, list) for c in columns]
+
+
+def _to_csv_cell(v: Any, is_json: bool = False) -> str:
+    # None은 따옴표 없는 CSV_NULL, 그 외는 전부 따옴표로 감쌈 (JSON/JSONB 컬럼은 값 종류와 무관하게 JSON 문자열)
+    if v is None:
+        return CSV_NULL
+    if is_json or isinstance(v, (dict, list)):
+        v = json.dumps(v, ensure_ascii=False, separators=(",", ":"))
+    s = str(_to_jsonable(v))
+    return '"' + s.replace('"', '""') + '"'
+
+
+def _csv_line(values: Sequence[Any], json_flags: Sequence[bool]) -> str:
+    """
+    csv.writer는 빈 문자열을 따옴표 없이 쓰기 때문에 (COPY에서 NULL로 읽힘) 직접 포맷.
+    PostgreSQL COPY ... (FORMAT csv, NULL CSV_NULL) 와 같은 규칙.
+    """
+    return ",".join(_to_csv_cell(v, j) for v, j in zip(values, json_flags)) + "\n"
+
+
+def stream_rows(
+    table: Table,
+    columns: List[str],
+    fmt: str = "ndjson",
+    order_by: Optional[str] = None,
+) -> Iterator[str]:
+    """
+    서버 사이드 커서(stream_results)로 행을 배치 단위로 읽어 NDJSON/CSV 라인을 yield.
+    ORM 객체를 만들지 않고 전체 결과를 메모리에 올리지 않으므로 메모리 사용량이 일정함.
+
+    요청 스코프의 Session(get_db)은 응답 스트리밍 도중 닫힐 수 있으므로
+    제너레이터가 직접 커넥션을 열고 닫는다.
+    """
+    stmt = select(*[table.c[name] for name in columns])
+    if order_by:
+        stmt = stmt.order_by(table.c[order_by])
+
+    json_flags = _json_flags(table, columns)
+    if fmt == "csv":
+        yield ",".join(columns) + "\n"
+
+    with engine.connect() as conn:
+        result = conn.execution_options(
+            stream_results=True, yield_per=EXPORT_BATCH_SIZE
+        ).execute(stmt)
+        for partition in result.partitions():
+            if fmt == "csv":
+                yield "".join(_csv_line(row, json_flags) for row in partition)
+            else:
+                yield "".join(
+                    json.dumps(
+                        {k: _to_jsonable(v) for k, v in zip(columns, row)},
+                        ensure_ascii=False,
+                        separators=(",", ":"),
+                    ) + "\n"
+                    for row in partition
+                )
+
+
+# --- 파싱 ---
+async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """바이트 청크 스트림을 줄 단위 문자열로 (청크 경계에 걸친 멀티바이트 문자 처리)"""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pending = ""
+    first = True
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        if first and pending:
+            pending = pending.lstrip("\ufeff")
+            first = False
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+def _split_csv_record(text: str) -> List[Optional[str]]:
+    """
+    CSV 레코드 하나를 필드로 분리. csv 모듈은 따옴표 여부를 알려주지 않아 직접 파싱:
+    따옴표 없는 CSV_NULL만 None, "" 는 빈 문자열.
+    """
+    fields: List[Optional[str]] = []
+    buf: List[str] = []
+    quoted = in_quotes = False
+    i = 0
+    while i < len(text):
+        ch = text[i]
+        if in_quotes:
+            if ch == '"':
+                if i + 1 < len(text) and text[i + 1] == '"':
+                    buf.append('"')
+                    i += 1
+                else:
+                    in_quotes = False
+            else:
+                buf.append(ch)
+        elif ch == '"':
+            in_quotes = quoted = True
+        elif ch == ",":
+            value = "".join(buf)
+            fields.append(None if not quoted and value == CSV_NULL else value)
+            buf, quoted = [], False
+        else:
+            buf.append(ch)
+        i += 1
+    value = "".join(buf)
+    fields.append(None if not quoted and value == CSV_NULL else value)
+    return fields
+
+
+async def _iter_csv_records(lines: AsyncIterator[str]) -> AsyncIterator[Tuple[int, List[Optional[str]]]]:
+    """
+    따옴표 안에 줄바꿈이 들어간 레코드도 처리하도록, 따옴표 개수가 짝수가 될 때까지 줄을 모아 파싱.
+    (레코드 시작 줄 번호(1부터), 필드 리스트) 를 yield.
+    """
+    record: List[str] = []
+    quotes = 0
+    lineno = start = 0
+    async for line in lines:
+        lineno += 1
+        if not record:
+            start = lineno
+        record.append(line)
+        quotes += line.count('"')
+        if quotes % 2:
+            continue
+        text = "\n".join(record).rstrip("\r")
+        record, quotes = [], 0
+        if text:
+            yield start, _split_csv_record(text)
+    if record:
+        raise ValueError("CSV 따옴표가 닫히지 않았습니다.")
+
+
+async def iter_rows(
+    chunks: AsyncIterator[bytes], content_type: Optional[str]
+) -> AsyncIterator[Tuple[int, Dict[str, Any], bool]]:
+    """
+    요청 바디 스트림을 (원본 줄 번호, 행 dict, CSV 여부) 로 하나씩 yield. 전체 바디를 메모리에 올리지 않음.
+    - text/csv: 첫 줄 헤더, NULL은 따옴표 없는 CSV_NULL, JSON 컬럼은 JSON 문자열
+    - 그 외: NDJSON (한 줄에 JSON 객체 하나)
+    """
+    lines = _iter_lines(chunks)
+    if content_type and "csv" in content_type:
+        header: Optional[List[str]] = None
+        async for lineno, fields in _iter_csv_records(lines):
+            if header is None:
+                header = [f or "" for f in fields]
+                continue
+            if len(fields) != len(header):
+                raise ValueError(f"{lineno}번째 줄: CSV 컬럼 수가 헤더와 다릅니다.")
+            yield lineno, dict(zip(header, fields)), True
+        return
+
+    lineno = 0
+    async for line in lines:
+        lineno += 1
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            obj = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{lineno}번째 줄 JSON 파싱 실패: {e.msg}")
+        if not isinstance(obj, dict):
+            raise ValueError(f"{lineno}번째 줄이 JSON 객체가 아닙니다.")
+        yield lineno, obj, False
+
+
+# --- 검증 ---
+def _coerce_csv(table: Table, name: str, v: str) -> Any:
+    """CSV 문자열 값을 컬럼 타입으로 변환 (CSV 행에만 사용)"""
+    py_type = _python_type(table, name)
+    if py_type in (dict, list):
+        return json.loads(v)
+    if py_type is int:
+        return int(v)
+    if py_type is datetime:
+        return datetime.fromisoformat(v)
+    if py_type is uuid.UUID:
+        return uuid.UUID(v)
+    return v
+
+
+def _check_json(table: Table, name: str, v: Any) -> Any:
+    """NDJSON 값이 컬럼 타입과 맞는지 검증 (문자열로 온 UUID/시각만 파싱)"""
+    py_type = _python_type(table, name)
+    if py_type is int:
+        ok = isinstance(v, int) and not isinstance(v, bool)
+    elif py_type is str:
+        ok = isinstance(v, str)
+    elif py_type in (dict, list):
+        ok = True  # JSON 컬럼은 어떤 JSON 값이든 그대로 저장
+    elif py_type is datetime:
+        ok = isinstance(v, str)
+        v = datetime.fromisoformat(v) if ok else v
+    elif py_type is uuid.UUID:
+        ok = isinstance(v, str)
+        v = uuid.UUID(v) if ok else v
+    else:
+        ok = True
+    if not ok:
+        raise ValueError(f"{name} 타입이 올바르지 않습니다: {type(v).__name__}")
+    return v
+
+
+def prepare_row(table: Table, row: Dict[str, Any], from_csv: bool) -> Dict[str, Any]:
+    """
+    입력 행 하나를 테이블 컬럼 기준으로 정규화.
+    - 모르는 키는 무시, None(NULL)은 생략
+    - CSV는 문자열을 컬럼 타입으로 변환, NDJSON은 타입만 검증
+    - COPY/executemany는 ORM default를 거치지 않으므로 id는 uuid4 발급,
+      스칼라 Column.default(예: Profile.version=1)는 모델 정의에서 채움
+    - 서버 default가 없는 NOT NULL 컬럼이 비면 ValueError
+    """
+    item: Dict[str, Any] = {}
+    for k, v in row.items():
+        if k not in table.c or v is None:
+            continue
+        item[k] = _coerce_csv(table, k, v) if from_csv else _check_json(table, k, v)
+    if not item.get("id"):
+        item["id"] = uuid.uuid4()
+    for c in table.columns:
+        if c.name not in item and c.default is not None and c.default.is_scalar:
+            item[c.name] = c.default.arg
+    missing = [
+        c.name for c in table.columns
+        if not c.nullable and c.server_default is None and c.name not in item
+    ]
+    if missing:
+        raise ValueError(f"필수 컬럼 누락: {', '.join(missing)}")
+    return item
+
+
+# --- 적재 ---
+def _copy_batch(db: Session, table: Table, cols: Sequence[str], batch: List[Dict[str, Any]]) -> None:
+    import psycopg2  # PostgreSQL에서만 호출됨
+
+    json_flags = _json_flags(table, cols)
+    buf = io.StringIO()
+    for item in batch:
+        buf.write(_csv_line([item[c] for c in cols], json_flags))
+    buf.seek(0)
+
+    sql = f"COPY {table.name} ({', '.join(cols)}) FROM STDIN WITH (FORMAT csv, NULL '{CSV_NULL}')"
+    # 세션과 같은 트랜잭션의 psycopg2 커넥션에서 COPY 실행
+    # raw 커서 예외는 SQLAlchemy가 감싸주지 않으므로 executemany 경로와 같은 예외로 변환
+    try:
+        with db.connection().connection.cursor() as cur:
+            cur.copy_expert(sql, buf)
+    except psycopg2.IntegrityError as e:
+        raise IntegrityError(sql, None, e)
+    except psycopg2.Error as e:
+        raise DBAPIError(sql, None, e)
+
+
+def _flush(db: Session, table: Table, cols: Tuple[str, ...], batch: List[Dict[str, Any]]) -> None:
+    if db.get_bind().dialect.name == "postgresql":
+        _copy_batch(db, table, cols, batch)
+    else:
+        db.execute(insert(table), batch)
+
+
+async def bulk_insert(
+    db: Session,
+    rows: AsyncIterator[Tuple[int, Dict[str, Any], bool]],
+    table: Table,
+) -> int:
+    """
+    iter_rows 스트림을 한 트랜잭션으로 대량 적재하고 적재한 행 수를 반환.
+    PostgreSQL은 COPY FROM STDIN, 그 외(SQLite 등)는 executemany INSERT로 폴백.
+    IMPORT_BATCH_SIZE 행마다 밀어넣으므로 메모리에는 배치 하나 분량만 유지된다.
+    바디는 비동기로 읽고, 블로킹 DB 호출(COPY/executemany/commit/rollback)은 스레드풀에서 실행해
+    이벤트 루프(다른 엔드포인트)를 막지 않는다.
+
+    빠진 컬럼을 NULL로 채우면 server_default(body/measures/created_at 등)가 적용되지 않으므로
+    채워진 컬럼 구성이 같은 행끼리 배치를 나눈다.
+
+    ValueError(입력 오류), IntegrityError(중복 id 등), DBAPIError(그 외 DB 오류)는 롤백 후 그대로 전파.
+    """
+    pending: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+    count = 0
+    try:
+        async for lineno, row, from_csv in rows:
+            try:
+                item = prepare_row(table, row, from_csv)
+            except (ValueError, TypeError) as e:
+                raise ValueError(f"{lineno}번째 줄: {e}")
+            cols = tuple(c.name for c in table.columns if c.name in item)
+            batch = pending.setdefault(cols, [])
+            batch.append(item)
+            count += 1
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                await run_in_threadpool(_flush, db, table, cols, batch)
+                pending[cols] = []
+        for cols, batch in pending.items():
+            if batch:
+                await run_in_threadpool(_flush, db, table, cols, batch)
+        await run_in_threadpool(db.commit)
+    except Exception:
+        await run_in_threadpool(db.rollback)
+        raise
+    return count
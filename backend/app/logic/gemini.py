@@ -4,6 +4,9 @@ from typing import Optional, List, Any, Dict
 from dotenv import load_dotenv
 import google.generativeai as genai
 
+from app.logic.prompt_builder import build_feedback_prompt
+from app.logic.utils import truncate_str
+
 # --- 1. 환경 설정 ---
 load_dotenv()
 API_KEY = os.getenv("GOOGLE_API_KEY")
@@ -43,7 +46,7 @@ QUALITY_SYSTEM_INSTRUCTION = (
 # 이 파일 내에서 동적으로 바꿔 끼울 전역 지시문
 _SYSTEM_INSTRUCTION: str = ""
 
-# [신규] 입력 축소 유틸: 숫자 반올림/긴 텍스트 자르기
+# [신규] 입력 축소 유틸: 숫자 반올림
 def _round_num(v: Any, nd: int = 3) -> Any:
     if isinstance(v, float):
         return round(v, nd)
@@ -53,11 +56,6 @@ def _round_num(v: Any, nd: int = 3) -> Any:
         return {k: _round_num(v[k], nd) for k in v}
     return v
 
-def _truncate_str(s: Any, maxlen: int = 200) -> Any:
-    if isinstance(s, str) and len(s) > maxlen:
-        return s[:maxlen] + "…"
-    return s
-
 def _compact_set_item(item: Dict[str, Any]) -> Dict[str, Any]:
     """세트 결과에서 거대 필드 제거 및 최소 요약만 남김"""
     meta = item.get("meta") or {}
@@ -72,7 +70,7 @@ def _compact_set_item(item: Dict[str, Any]) -> Dict[str, Any]:
     compact_stats = _round_num(compact_stats, 3)
 
     # 길 수 있는 텍스트는 잘라줌
-    ai_feedback = _truncate_str(item.get("aiFeedback", ""), 180)
+    ai_feedback = truncate_str(item.get("aiFeedback", ""), 180)
 
     # 절대 금지: analysisData, landmarkHistory 같은 초대형 필드
     return {
@@ -156,39 +154,36 @@ async def get_conversational_feedback(
     rep_counter: int,
     stage: str,
     body_profile: Optional[dict] = None,
-    real_time_analysis: Optional[dict] = None,
+    real_time_analysis: Optional[Any] = None,
     angle: Optional[float] = None,
     history: Optional[List[str]] = None,
     extra_context: Optional[dict] = None,
+    compact_profile_data: Optional[dict] = None,
 ) -> dict:
     """
     '빠른 피드백' 모델(model_fast)을 사용하여 정확도와 피드백을 JSON으로 요청합니다.
+    compact_profile_data: 이미 축소/캐시된 프로필(get_latest_prompt_profile). 있으면 body_profile 대신 그대로 사용.
     """
     if not model_fast:
         return {"accuracy": 0, "feedback": "⚠️ Gemini 'FAST' 모델이 설정되지 않았습니다."}
 
-    # ✅ 프롬프트를 장문 규칙 없이 '데이터 JSON'만 보내도록 축소
-    disp = (extra_context or {}).get("exercise_display_name") or exercise_name
-    payload = {
-        "exercise_display_name": disp,
-        "exercise_id": exercise_name,
-        "stage": stage,
-        "rep_counter": rep_counter,
-        "target_reps": (extra_context or {}).get("target_reps"),
-        "set": {
-            "index": (extra_context or {}).get("set_index"),
-            "total": (extra_context or {}).get("total_sets"),
-        },
-        # 큰 데이터는 슬림화
-        "user_profile": _round_num(body_profile, 3) if body_profile else None,
-        "realtime_summary": _round_num(real_time_analysis, 3) if real_time_analysis else None,
-        "angle_sample": _round_num(angle, 3) if angle is not None else None,
-        # 히스토리는 최근 N개만 (과도한 텍스트 방지)
-        "history_tail": history[-20:] if history and len(history) > 20 else history,
-    }
-
-    # 공백 제거하여 토큰 절약
-    prompt = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+    # ✅ 스키마 기반 축소 + 토큰 예산 적용 (랜드마크 히스토리는 항상 요약 통계로)
+    prompt, prompt_stats = build_feedback_prompt(
+        exercise_name=exercise_name,
+        rep_counter=rep_counter,
+        stage=stage,
+        body_profile=body_profile,
+        real_time_analysis=real_time_analysis,
+        angle=angle,
+        history=history,
+        extra_context=extra_context,
+        compact_profile_data=compact_profile_data,
+    )
+    print(
+        f"[INFO] FAST 프롬프트 크기: chars={prompt_stats['chars']}, "
+        f"est_tokens={prompt_stats['est_tokens']}/{prompt_stats['budget']}, "
+        f"truncated={prompt_stats['truncated']}, over_budget={prompt_stats['over_budget']}"
+    )
 
     try:
         resp = await model_fast.generate_content_async(prompt)
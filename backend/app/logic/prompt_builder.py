@@ -0,0 +1,366 @@
+# app/logic/prompt_builder.py
+import json
+import math
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.logic.utils import calculate_angle, truncate_str
+
+# ===== (A) 페이로드 스키마 =====
+# 프로필(체형분석 measures)에서 프롬프트로 보낼 항목 화이트리스트: {키: 소수점 자리수}
+# measures는 프론트엔드 MeasureOrchestrator 결과를 그대로 저장한 것이라 이 저장소에는 키 정의가 없다.
+# 아래 기본값은 가정한 키이므로, 실제 키로 환경변수 PROMPT_PROFILE_FIELDS="shoulder_width:3,hip_width:3" 를 설정할 것.
+DEFAULT_PROFILE_FIELDS: Dict[str, int] = {
+    "height_cm": 1,
+    "weight_kg": 1,
+    "shoulder_width": 3,
+    "hip_width": 3,
+    "torso_length": 3,
+    "arm_length": 3,
+    "leg_length": 3,
+    "thigh_length": 3,
+    "shin_length": 3,
+    "knee_angle": 1,
+    "hip_angle": 1,
+    "shoulder_tilt": 1,
+    "pelvis_tilt": 1,
+    "symmetry": 2,
+}
+
+def _parse_profile_fields(s: str) -> Dict[str, int]:
+    fields: Dict[str, int] = {}
+    for part in s.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        key, _, nd = part.partition(":")
+        fields[key.strip()] = int(nd) if nd.strip().isdigit() else 3
+    return fields
+
+_PROFILE_FIELDS_STR = os.getenv("PROMPT_PROFILE_FIELDS", "")
+PROFILE_FIELDS = _parse_profile_fields(_PROFILE_FIELDS_STR) or DEFAULT_PROFILE_FIELDS
+
+# 화이트리스트에 걸리는 항목이 하나도 없을 때의 폴백: 숫자 leaf를 키 이름순으로 최대 N개 (경고 로그 출력)
+# 스키마가 아닌 임시 방편이므로 PROMPT_PROFILE_FIELDS 설정으로 피해야 한다.
+PROFILE_FALLBACK_MAX_FIELDS = 12
+PROFILE_FALLBACK_NDIGITS = 2
+
+# 랜드마크 요약에 쓰는 MediaPipe Pose 인덱스
+LANDMARK_POINTS = {
+    "shoulder_l": 11, "shoulder_r": 12,
+    "hip_l": 23, "hip_r": 24,
+    "knee_l": 25, "knee_r": 26,
+    "ankle_l": 27, "ankle_r": 28,
+}
+# (a, b, c) → b 꼭짓점 각도
+LANDMARK_ANGLES = {
+    "knee_l": (23, 25, 27),
+    "knee_r": (24, 26, 28),
+    "hip_l": (11, 23, 25),
+    "hip_r": (12, 24, 26),
+}
+
+# 실시간 분석(dict)에서 남길 최대 항목 수 / 키 길이 / 문자열 길이
+REALTIME_MAX_FIELDS = 16
+REALTIME_MAX_KEY = 32
+REALTIME_MAX_STR = 80
+# 클라이언트가 보내는 식별 문자열(운동 이름/ID/stage) 최대 길이
+LABEL_MAX_STR = 40
+HISTORY_MAX_ITEMS = 20
+HISTORY_MAX_STR = 120
+
+# ===== (B) 토큰 예산 =====
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "600"))
+
+# 예산 초과 시 적용하는 축소 단계 (순서 고정 → 같은 입력이면 항상 같은 결과)
+# 세트 피드백의 핵심인 realtime_summary는 가장 마지막에 버린다.
+TRUNCATION_STEPS = (
+    "history_tail:5",
+    "history_tail:0",
+    "realtime_summary:points",
+    "angle_sample",
+    "user_profile",
+    "realtime_summary",
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    로컬 토큰 수 추정 (API 호출 없음).
+    ASCII는 약 4자당 1토큰, 한글 등 비ASCII는 1자당 1토큰으로 보수적으로 계산.
+    """
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    ascii_chars = len(text) - non_ascii
+    return math.ceil(ascii_chars / 4) + non_ascii
+
+
+def _dumps(payload: Dict[str, Any]) -> str:
+    # 공백 제거하여 토큰 절약
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+
+
+def _q(v: Any, nd: int) -> Any:
+    if isinstance(v, bool) or not isinstance(v, float):
+        return v
+    if isinstance(v, float) and not math.isfinite(v):
+        return None
+    return round(v, nd) if nd > 0 else int(round(v))
+
+
+# ===== (C) 프로필 =====
+def compact_profile(measures: Optional[dict]) -> Optional[Dict[str, Any]]:
+    """
+    체형분석 measures를 화이트리스트 + 양자화된 평평한 dict로 축소.
+    프로필은 잘 바뀌지 않으므로 호출자는 결과를 캐시해서 재사용한다 (analysis_utils 참고).
+    """
+    if not measures or not isinstance(measures, dict):
+        return None
+
+    out: Dict[str, Any] = {}
+    for key, nd in PROFILE_FIELDS.items():
+        v = measures.get(key)
+        if isinstance(v, dict):
+            # {"value": 0.42, "unit": ...} 형태 허용
+            v = v.get("value")
+        if isinstance(v, (int, float)) and not isinstance(v, bool):
+            out[key] = _q(v, nd)
+    if out:
+        return out
+
+    # 화이트리스트와 맞는 키가 없으면 숫자 스칼라 leaf만 (키 정렬 순) 일부 전송
+    leaves: List[Tuple[str, float]] = []
+    def walk(prefix: str, node: Any) -> None:
+        if isinstance(node, dict):
+            for k in sorted(node, key=str):
+                walk(f"{prefix}.{k}" if prefix else str(k), node[k])
+        elif isinstance(node, (int, float)) and not isinstance(node, bool):
+            leaves.append((prefix, node))
+    walk("", measures)
+    if leaves:
+        print(
+            f"[WARN] 프로필 measures에 화이트리스트 키가 없어 숫자 항목 {min(len(leaves), PROFILE_FALLBACK_MAX_FIELDS)}개를 "
+            f"키 이름순으로 보냅니다. PROMPT_PROFILE_FIELDS를 설정하세요. (keys={sorted(measures)[:8]})"
+        )
+    return {k: _q(v, PROFILE_FALLBACK_NDIGITS) for k, v in leaves[:PROFILE_FALLBACK_MAX_FIELDS]} or None
+
+
+# ===== (D) 실시간 분석 / 랜드마크 =====
+def _stats(values: List[float], nd: int) -> Optional[Dict[str, Any]]:
+    if not values:
+        return None
+    return {
+        "min": _q(min(values), nd),
+        "max": _q(max(values), nd),
+        "mean": _q(sum(values) / len(values), nd),
+    }
+
+
+def _is_landmark_frames(v: Any) -> bool:
+    """비어 있는 프레임(포즈 미검출)이나 null은 건너뛰고 첫 유효 프레임으로 판별"""
+    if not isinstance(v, list):
+        return False
+    for f in v:
+        if isinstance(f, list) and f:
+            return isinstance(f[0], dict)
+    return False
+
+
+def summarize_landmarks(frames: List[list]) -> Dict[str, Any]:
+    """
+    랜드마크 프레임 히스토리(프레임 × 33 포인트)를 요약 통계로 축소.
+    - 관절 각도(무릎/엉덩이) min/max/mean, 좌우 무릎 각도 차 평균
+    - 주요 포인트 y좌표 min/max/mean
+    프레임 수와 무관하게 결과 크기가 고정된다.
+    """
+    angles: Dict[str, List[float]] = {k: [] for k in LANDMARK_ANGLES}
+    points: Dict[str, List[float]] = {k: [] for k in LANDMARK_POINTS}
+    knee_diffs: List[float] = []
+
+    for f in frames:
+        if not isinstance(f, list):
+            continue
+        frame_angles: Dict[str, float] = {}
+        for name, (ia, ib, ic) in LANDMARK_ANGLES.items():
+            if max(ia, ib, ic) < len(f) and all(isinstance(f[i], dict) for i in (ia, ib, ic)):
+                a = calculate_angle(f[ia], f[ib], f[ic])
+                if a is not None:
+                    angles[name].append(a)
+                    frame_angles[name] = a
+        if "knee_l" in frame_angles and "knee_r" in frame_angles:
+            knee_diffs.append(abs(frame_angles["knee_l"] - frame_angles["knee_r"]))
+        for name, idx in LANDMARK_POINTS.items():
+            if idx < len(f) and isinstance(f[idx], dict):
+                y = f[idx].get("y")
+                if isinstance(y, (int, float)):
+                    points[name].append(y)
+
+    summary: Dict[str, Any] = {"frames": len(frames)}
+    angle_stats = {k: s for k, v in angles.items() if (s := _stats(v, 1))}
+    if angle_stats:
+        summary["angles"] = angle_stats
+    if knee_diffs:
+        summary["knee_lr_diff_mean"] = _q(sum(knee_diffs) / len(knee_diffs), 1)
+    point_stats = {k: s for k, v in points.items() if (s := _stats(v, 3))}
+    if point_stats:
+        summary["points_y"] = point_stats
+    return summary
+
+
+def _is_number(v: Any) -> bool:
+    return isinstance(v, (int, float)) and not isinstance(v, bool)
+
+
+def summarize_items(items: List[Any]) -> Dict[str, Any]:
+    """
+    랜드마크가 아닌 일반 리스트(예: rep별 결과 dict 리스트)를 요약 통계로 축소.
+    - dict 항목: 숫자 키별 min/max/mean (처음 나온 키 순서, 최대 REALTIME_MAX_FIELDS개)
+    - 숫자 항목: 전체 min/max/mean
+    """
+    fields: Dict[str, List[float]] = {}
+    numbers: List[float] = []
+    for it in items:
+        if _is_number(it):
+            numbers.append(it)
+        elif isinstance(it, dict):
+            for k, v in it.items():
+                if not _is_number(v):
+                    continue
+                key = truncate_str(str(k), REALTIME_MAX_KEY)
+                if key in fields:
+                    fields[key].append(v)
+                elif len(fields) < REALTIME_MAX_FIELDS:
+                    fields[key] = [v]
+
+    summary: Dict[str, Any] = {"items": len(items)}
+    if numbers:
+        summary["values"] = _stats(numbers, 3)
+    field_stats = {k: _stats(v, 3) for k, v in fields.items()}
+    if field_stats:
+        summary["fields"] = field_stats
+    return summary
+
+
+def compact_realtime(analysis: Any) -> Any:
+    """
+    실시간 분석 입력을 축소.
+    - 랜드마크 프레임 리스트 → summarize_landmarks 요약 통계 (원본 프레임은 절대 보내지 않음)
+    - 그 외 리스트 → summarize_items 숫자 필드 요약 통계
+    - dict → 스칼라만 양자화/자르기, 중첩 리스트는 위 규칙으로 요약, 항목 수 제한
+    """
+    if analysis is None or (isinstance(analysis, (list, dict)) and not analysis):
+        return None
+    if _is_landmark_frames(analysis):
+        return summarize_landmarks(analysis)
+    if isinstance(analysis, dict):
+        out: Dict[str, Any] = {}
+        for k in list(analysis)[:REALTIME_MAX_FIELDS]:
+            v = analysis[k]
+            key = truncate_str(str(k), REALTIME_MAX_KEY)
+            if _is_landmark_frames(v):
+                out[key] = summarize_landmarks(v)
+            elif isinstance(v, list) and v:
+                out[key] = summarize_items(v)
+            elif isinstance(v, (int, float, str, bool)) or v is None:
+                out[key] = truncate_str(_q(v, 3), REALTIME_MAX_STR)
+        return out or None
+    if isinstance(analysis, list):
+        return summarize_items(analysis)
+    return truncate_str(_q(analysis, 3), REALTIME_MAX_STR)
+
+
+# ===== (E) 프롬프트 빌드 =====
+def _apply_step(payload: Dict[str, Any], step: str) -> bool:
+    """축소 단계 하나 적용. 실제로 줄어든 게 있으면 True"""
+    field, _, arg = step.partition(":")
+    v = payload.get(field)
+    if v is None:
+        return False
+    if field == "history_tail" and arg:
+        n = int(arg)
+        if len(v) <= n:
+            return False
+        payload[field] = v[-n:] if n else None
+        return True
+    if field == "realtime_summary" and arg == "points":
+        # 랜드마크 요약은 최상위이거나 dict 안에 한 단계 중첩되어 있을 수 있음
+        if not isinstance(v, dict):
+            return False
+        changed = False
+        slim: Dict[str, Any] = {}
+        for k, x in v.items():
+            if k == "points_y":
+                changed = True
+                continue
+            if isinstance(x, dict) and "points_y" in x:
+                x = {kk: xx for kk, xx in x.items() if kk != "points_y"}
+                changed = True
+            slim[k] = x
+        if changed:
+            payload[field] = slim
+        return changed
+    payload[field] = None
+    return True
+
+
+def build_feedback_prompt(
+    exercise_name: str,
+    rep_counter: int,
+    stage: str,
+    body_profile: Optional[dict] = None,
+    real_time_analysis: Any = None,
+    angle: Optional[float] = None,
+    history: Optional[List[str]] = None,
+    extra_context: Optional[dict] = None,
+    compact_profile_data: Optional[dict] = None,
+    token_budget: Optional[int] = None,
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    빠른 피드백용 프롬프트(JSON 문자열)를 스키마 기반으로 생성하고 크기 정보를 함께 반환.
+    compact_profile_data(이미 compact_profile을 거친 캐시 값)가 있으면 body_profile 대신 그대로 쓴다.
+    토큰 추정치가 예산을 넘으면 TRUNCATION_STEPS 순서대로 선택 필드를 줄이고,
+    그래도 넘으면 over_budget=True로 표시한다.
+    반환: (prompt, {"chars", "est_tokens", "budget", "truncated", "over_budget"})
+    """
+    budget = token_budget if token_budget is not None else PROMPT_TOKEN_BUDGET
+    ctx = extra_context or {}
+    tail = [truncate_str(h, HISTORY_MAX_STR) for h in history[-HISTORY_MAX_ITEMS:]] if history else None
+    if compact_profile_data is None:
+        compact_profile_data = compact_profile(body_profile)
+
+    payload = {
+        "exercise_display_name": truncate_str(ctx.get("exercise_display_name") or exercise_name, LABEL_MAX_STR),
+        "exercise_id": truncate_str(exercise_name, LABEL_MAX_STR),
+        "stage": truncate_str(stage, LABEL_MAX_STR),
+        "rep_counter": rep_counter,
+        "target_reps": ctx.get("target_reps"),
+        "set": {
+            "index": ctx.get("set_index"),
+            "total": ctx.get("total_sets"),
+        },
+        "user_profile": compact_profile_data or None,
+        "realtime_summary": compact_realtime(real_time_analysis),
+        "angle_sample": _q(angle, 1) if angle is not None else None,
+        "history_tail": tail,
+    }
+
+    prompt = _dumps(payload)
+    tokens = estimate_tokens(prompt)
+    truncated: List[str] = []
+    for step in TRUNCATION_STEPS:
+        if tokens <= budget:
+            break
+        if _apply_step(payload, step):
+            truncated.append(step)
+            prompt = _dumps(payload)
+            tokens = estimate_tokens(prompt)
+
+    stats = {
+        "chars": len(prompt),
+        "est_tokens": tokens,
+        "budget": budget,
+        "truncated": truncated,
+        "over_budget": tokens > budget,
+    }
+    if stats["over_budget"]:
+        print(f"[WARN] 프롬프트가 모든 축소 후에도 예산 초과: est_tokens={tokens}/{budget}")
+    return prompt, stats
@@ -0,0 +1,19 @@
+# app/logic/utils.py
+import math
+from typing import Any, Optional
+
+def calculate_angle(a, b, c) -> Optional[float]:
+    """세 랜드마크(a-b-c)에서 b 꼭짓점 각도(도)를 계산. 좌표가 없으면 None"""
+    try:
+        if not all(k in a and k in b and k in c for k in ('x', 'y')): return None
+        rad = math.atan2(c['y'] - b['y'], c['x'] - b['x']) - math.atan2(a['y'] - b['y'], a['x'] - b['x'])
+        angle = abs(math.degrees(rad))
+        if angle > 180: angle = 360 - angle
+        return angle
+    except (TypeError, KeyError): return None
+
+def truncate_str(s: Any, maxlen: int = 200) -> Any:
+    """문자열이 maxlen보다 길면 잘라서 '…'를 붙임 (문자열이 아니면 그대로)"""
+    if isinstance(s, str) and len(s) > maxlen:
+        return s[:maxlen] + "…"
+    return s
@@ -0,0 +1,7 @@
+# backend/tests/conftest.py
+import os
+import sys
+
+# app.db가 import 시점에 엔진을 만들므로 Postgres 드라이버 없이도 돌 수 있게 SQLite로 지정
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
@@ -0,0 +1,45 @@
+# backend/tests/test_bulk_io.py
+import asyncio
+
+from app.logic.bulk_io import CSV_NULL, _csv_line, _split_csv_record, iter_rows
+
+
+def _rows(body: bytes, content_type: str = "text/csv", chunk: int = 5):
+    async def chunks():
+        for i in range(0, len(body), chunk):
+            yield body[i:i + chunk]
+
+    async def collect():
+        return [r async for r in iter_rows(chunks(), content_type)]
+
+    return asyncio.run(collect())
+
+
+def test_csv_line_quotes_values_and_leaves_null_bare():
+    line = _csv_line([None, "", 'a"b,c', {"k": [1]}, "str"], [False, False, False, True, True])
+    assert line == '\\N,"","a""b,c","{""k"":[1]}","""str"""\n'
+
+
+def test_split_csv_record_null_vs_empty():
+    assert _split_csv_record('\\N,"\\N","",,"a""b,c"') == [None, CSV_NULL, "", "", 'a"b,c']
+
+
+def test_writer_reader_round_trip():
+    values = ["line1\nline2", 'say "hi"', "", None, "a,b", "\\N"]
+    line = _csv_line(values, [False] * len(values))
+    assert _split_csv_record(line.rstrip("\n")) == values
+
+
+def test_iter_rows_csv_bom_crlf_and_embedded_newline():
+    body = '\ufeffname,note\r\n"스쿼트","a\r\nb"\r\n"x",\\N\r\n"",""\r\n'.encode("utf-8")
+    rows = _rows(body)
+    assert rows == [
+        (2, {"name": "스쿼트", "note": "a\r\nb"}, True),
+        (4, {"name": "x", "note": None}, True),
+        (5, {"name": "", "note": ""}, True),
+    ]
+
+
+def test_iter_rows_ndjson_keeps_source_line_numbers():
+    body = b'{"a": 1}\n\n{"a": ""}\n'
+    assert _rows(body, "application/x-ndjson") == [(1, {"a": 1}, False), (3, {"a": ""}, False)]